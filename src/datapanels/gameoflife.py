@@ -4,18 +4,25 @@ See https://en.wikipedia.org/wiki/Conway%27s_Game_of_Life for details about
 the game.
 
 """
+import os
 import random
-from typing import Tuple, Set, Optional, Union, List
+import multiprocessing
+from multiprocessing import shared_memory
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Tuple, Set, Optional, Union, List, FrozenSet
 import re
 import numpy as np
 from kivy.lang.builder import Builder
-from kivy.properties import ListProperty, NumericProperty, ObjectProperty
+from kivy.properties import ListProperty, NumericProperty, ObjectProperty, StringProperty
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.dropdown import DropDown
 from kivy.clock import Clock
 from kivy.app import App
+from kivy.graphics import Color, Rectangle, Line, InstructionGroup
 from kwidgets.uix.pixelatedgrid import PixelatedGrid
+from datapanels.util import has_method
 
 
 def translate(state: Set[Tuple[int, int]], x: int, y: int, additive: bool=False) -> Set[Tuple[int, int]]:
@@ -93,6 +100,8 @@ def rle_decode(rle_text: str) -> Set[Tuple[int, int]]:
     ans = []
     x=0
     y=0
+    # Skip comment (#) and header (x = ...) lines
+    rle_text = re.sub(r"^\s*(#|x\s*=).*$", "", rle_text, flags=re.MULTILINE)
     for g in re.findall(r"\d*b|\d*o|\d*\$", rle_text):
         num = 1 if len(g)==1 else int(g[:-1])
         code = g[-1]
@@ -107,6 +116,74 @@ def rle_decode(rle_text: str) -> Set[Tuple[int, int]]:
                 x += 1
     return set(ans)
 
+
+def parse_rule(rule: str) -> Tuple[FrozenSet[int], FrozenSet[int]]:
+    """ Parse a Life-like rulestring
+
+    Accepts B/S notation, like "B3/S23" (Conway's Game of Life), "B36/S23" (HighLife) or "B2/S" (Seeds), as well as
+    the older S/B notation, like "23/3" or "S23/B3".
+
+    :param rule: The rulestring
+    :return: (neighbor counts that bring a dead cell to life, neighbor counts that keep a live cell alive)
+    """
+    m = re.fullmatch(r"\s*[Bb]([0-8]*)\s*/\s*[Ss]([0-8]*)\s*", rule)
+    if m is not None:
+        birth, survival = m.groups()
+    else:
+        m = re.fullmatch(r"\s*[Ss]?([0-8]*)\s*/\s*[Bb]?([0-8]*)\s*", rule)
+        if m is None:
+            raise RuntimeError("Invalid rule %s. Rules must be in the form B{digits}/S{digits}" % rule)
+        survival, birth = m.groups()
+    if "0" in birth:
+        raise RuntimeError("Invalid rule %s. Rules where cells are born with 0 neighbors (B0) are not supported" % rule)
+    return frozenset(int(d) for d in birth), frozenset(int(d) for d in survival)
+
+
+@lru_cache(maxsize=None)
+def compile_rule(rule: str) -> np.ndarray:
+    """ Compile a Life-like rulestring into a neighborhood lookup table
+
+    The neighborhood of a cell is encoded as a 9 bit index where the cell at offset (xo, yo) is bit 3*(yo+1)+(xo+1),
+    so the cell itself is bit 4 (see neighborhood_index).
+
+    :param rule: The rulestring, such as "B3/S23"
+    :return: Read only uint8 array with 512 entries, 1 if the cell is alive in the next generation
+    """
+    birth, survival = parse_rule(rule)
+    index = np.arange(512)
+    center = (index >> 4) & 1
+    counts = sum([(index >> bit) & 1 for bit in range(9)]) - center
+    table = np.where(center == 1, np.isin(counts, list(survival)), np.isin(counts, list(birth))).astype(np.uint8)
+    table.setflags(write=False)
+    return table
+
+
+def neighborhood_index(padded: np.ndarray) -> np.ndarray:
+    """ Compute the 9 bit neighborhood index (see compile_rule) of every cell in a board
+
+    :param padded: Board indexed [y, x] with an extra row or column on every side
+    :return: uint16 array with the index of every cell except the outside rows and columns of padded
+    """
+    height = padded.shape[0]-2
+    width = padded.shape[1]-2
+    index = np.zeros((height, width), dtype=np.uint16)
+    for yo in (-1, 0, 1):
+        for xo in (-1, 0, 1):
+            index |= padded[1+yo:height+1+yo, 1+xo:width+1+xo].astype(np.uint16) << (3*(yo+1)+(xo+1))
+    return index
+
+
+def rle_rule(rle_text: str, default: str = "B3/S23") -> str:
+    """ Get the rule from the header line of an RLE pattern (for example "x = 3, y = 3, rule = B36/S23")
+
+    :param rle_text:
+    :param default: The rule to use if the pattern doesn't specify one
+    :return: The rulestring
+    """
+    m = re.search(r"^\s*x\s*=.*?rule\s*=\s*([^\s,]+)", rle_text, re.MULTILINE | re.IGNORECASE)
+    return default if m is None else m.group(1)
+
+
 # Patterns taken from LifeWiki: https://conwaylife.com/wiki/Main_Page
 
 basic_patterns = {
@@ -157,11 +234,27 @@ class GameOfLifeEngine:
     either has to be a live cell or adjecent to a live cell.  So only dealing with currently live cells and their
     neighbors reduces the amount of computation that has to be performed.
 
+    The rule defaults to Conway's B3/S23, but any Life-like rule can be used (see set_rule).
+
     """
     x_max: int = 100
     y_max: int = 100
     active_cells: Set[Tuple[int, int]] = set()
     offsets: Set[Tuple[int, int]] = {(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)}
+    rule: str = "B3/S23"
+    birth: FrozenSet[int] = frozenset({3})
+    survival: FrozenSet[int] = frozenset({2, 3})
+    rule_table: np.ndarray = compile_rule("B3/S23")
+
+    def set_rule(self, rule: str):
+        """ Change the rule used to compute successive states
+
+        :param rule: A Life-like rulestring such as "B3/S23" or "B36/S23" (see parse_rule)
+        :return:
+        """
+        self.birth, self.survival = parse_rule(rule)
+        self.rule_table = compile_rule(rule)
+        self.rule = rule
 
     def all_neighbors(self, x: int, y: int) -> List[Tuple[int, int]]:
         """ Get a list of the coordinates of all the neighbors of some cell.
@@ -229,16 +322,1147 @@ class GameOfLifeEngine:
         new_state = set()
         for c in self.active_cells:
             active_neighbors = self.num_active_neighbors(c[0], c[1])
-            if active_neighbors == 2 or active_neighbors == 3:
+            if active_neighbors in self.survival:
                 new_state.update([c])
             for neighbor in self.all_neighbors(c[0], c[1]):
                 if neighbor not in self.active_cells and neighbor not in new_state:
-                    if self.num_active_neighbors(neighbor[0], neighbor[1]) == 3:
+                    if self.num_active_neighbors(neighbor[0], neighbor[1]) in self.birth:
                         new_state.update([neighbor])
         self.active_cells = new_state
         return self.active_cells
 
 
+class DenseGameOfLifeEngine(GameOfLifeEngine):
+    """ Game of Life implementation backed by a dense NumPy array
+
+    The visible board (0<=x<=x_max, 0<=y<=y_max) is stored as a uint8 array indexed [y, x], and each generation is
+    computed for the whole array at once by looking up each cell's neighborhood in rule_table, instead of a per-cell
+    loop.  This is much faster than the set based engine once the board has a meaningful number of live cells.
+
+    Live cells that are off the board (for example, after the board shrinks or a pattern is placed near the edge) are
+    kept in a small set.  As with GameOfLifeEngine, they do not count as neighbors of anything, and they survive only
+    if they are adjacent to the board and have 2 or 3 live neighbors on it.  This gives exactly the same results as
+    the set based engine.
+
+    active_cells is still available as a set of tuples so that the engine can be used as a drop in replacement.
+
+    """
+
+    def __init__(self):
+        """ Create a new DenseGameOfLifeEngine instance with an empty board
+
+        """
+        self._board = np.zeros((self.y_max+1, self.x_max+1), dtype=np.uint8)
+        self._outside = set()
+
+    @property
+    def active_cells(self) -> Set[Tuple[int, int]]:
+        """ The set of X,Y coordinates of all the live cells
+
+        :return: A new set built from the board.  Modifying it does not change the engine.
+        """
+        ys, xs = np.nonzero(self._board)
+        return set(zip(xs.tolist(), ys.tolist())).union(self._outside)
+
+    @active_cells.setter
+    def active_cells(self, cells: Set[Tuple[int, int]]):
+        """ Replace the board with the provided live cells
+
+        :param cells: X,Y coordinates of the live cells
+        :return:
+        """
+        self._board = np.zeros((self.y_max+1, self.x_max+1), dtype=np.uint8)
+        self._outside = set()
+        self._add_cells(cells)
+
+    def _add_cells(self, cells: Set[Tuple[int, int]]):
+        """ Mark the provided cells as alive, putting cells that are off the board in _outside
+
+        :param cells: X,Y coordinates of the cells to activate
+        :return:
+        """
+        coords = np.array(list(cells), dtype=np.int64).reshape(-1, 2)
+        on_board = (coords[:, 0] >= 0) & (coords[:, 0] <= self.x_max) & (coords[:, 1] >= 0) & (coords[:, 1] <= self.y_max)
+        self._board[coords[on_board, 1], coords[on_board, 0]] = 1
+        self._outside.update(map(tuple, coords[~on_board].tolist()))
+
+    def _resize(self, x_max: int, y_max: int):
+        """ Change the size of the board, keeping all of the live cells
+
+        :param x_max: The new largest x value
+        :param y_max: The new largest y value
+        :return:
+        """
+        cells = self.active_cells
+        self.x_max = x_max
+        self.y_max = y_max
+        self.active_cells = cells
+
+    def is_active(self, x: int, y: int) -> int:
+        """ Whether the indicated cell is alive
+
+        :param x:
+        :param y:
+        :return: 1 if it is alive, 0 otherwise
+        """
+        if 0 <= x <= self.x_max and 0 <= y <= self.y_max:
+            return int(self._board[y, x])
+        return 1 if (x, y) in self._outside else 0
+
+    def clear(self):
+        """ Mark every cell as dead
+
+        :return:
+        """
+        self._board = np.zeros((self.y_max+1, self.x_max+1), dtype=np.uint8)
+        self._outside = set()
+
+    def random(self, p: Union[float, int]):
+        """ Set some cells randomly to being alive
+
+        :param p: If in the range of 0 to 1, select that proportion of cells to make alive.  Otherwise treat as the
+        number of cells to make alive.
+        :return:
+        """
+        if p<1:
+            numcells = int(self.x_max*self.y_max*p)
+        else:
+            numcells = int(p)
+        self._board[np.random.randint(0, self.y_max, numcells), np.random.randint(0, self.x_max, numcells)] = 1
+
+    def neighborhood_indexes(self) -> np.ndarray:
+        """ Compute the neighborhood index (see compile_rule) of every cell on the board and in the ring just outside it
+
+        Only cells on the board are included in the indexes.
+
+        :return: uint16 array of shape (y_max+3, x_max+3).  The index for cell (x,y) is at [y+1, x+1].
+        """
+        return neighborhood_index(np.pad(self._board, 2))
+
+    def step(self, x_max: Optional[int] = None, y_max: Optional[int] = None):
+        """ Update the state.
+
+        Run one generation.
+
+        :param x_max: The largest x value for the visible board
+        :param y_max: The largest y value for the visible board
+        :return: In addition to updating the board, return the set of active cells.
+        """
+        x_max = self.x_max if x_max is None else x_max
+        y_max = self.y_max if y_max is None else y_max
+        if x_max != self.x_max or y_max != self.y_max:
+            self._resize(x_max, y_max)
+
+        indexes = self.neighborhood_indexes()
+        new_board = self.rule_table[indexes[1:-1, 1:-1]]
+
+        # Off-board cells never come to life, but the ones touching the board can survive
+        new_outside = set()
+        for x, y in self._outside:
+            if -1 <= x <= self.x_max+1 and -1 <= y <= self.y_max+1 and self.rule_table[indexes[y+1, x+1] | 16]:
+                new_outside.add((x, y))
+
+        self._board = new_board
+        self._outside = new_outside
+        return self.active_cells
+
+
+def _full_add(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ Bitwise full adder
+
+    :return: (sum, carry) for every bit position
+    """
+    a_xor_b = a ^ b
+    return a_xor_b ^ c, (a & b) | (c & a_xor_b)
+
+
+class BitboardGameOfLifeEngine(GameOfLifeEngine):
+    """ Game of Life implementation backed by bit-packed rows
+
+    Each row of the visible board (0<=x<=x_max, 0<=y<=y_max) is packed into uint64 words, with cell x stored in bit
+    x%64 of word x//64.  A generation is computed for 64 cells at a time by shifting whole rows to line up the eight
+    neighbors and adding them with bitwise full adders.  The rule is then applied to the bit planes of the counts.  The board uses 1 bit per cell, regardless of how many cells
+    are alive.
+
+    Live cells that are off the board are handled exactly as in DenseGameOfLifeEngine, so the results are the same as
+    GameOfLifeEngine.
+
+    """
+
+    def __init__(self):
+        """ Create a new BitboardGameOfLifeEngine instance with an empty board
+
+        """
+        self.clear()
+
+    def _words_per_row(self) -> int:
+        return (self.x_max + 64) // 64
+
+    def _last_word_mask(self) -> np.uint64:
+        """ Mask that clears the bits of the last word in a row that are beyond x_max
+
+        """
+        used = (self.x_max + 1) % 64
+        return np.uint64(0xFFFFFFFFFFFFFFFF) if used == 0 else np.uint64((1 << used) - 1)
+
+    def to_array(self) -> np.ndarray:
+        """ Unpack the board
+
+        :return: uint8 array indexed [y, x] with 1 for live cells.  Cells off the board are not included.
+        """
+        return np.unpackbits(self._board.view(np.uint8), axis=1, bitorder='little')[:, :self.x_max+1]
+
+    def from_array(self, board: np.ndarray):
+        """ Replace the board with the provided array
+
+        :param board: array indexed [y, x] of shape (y_max+1, x_max+1) where nonzero values are live cells
+        :return:
+        """
+        packed = np.packbits(board.astype(bool), axis=1, bitorder='little')
+        padded = np.zeros((board.shape[0], self._words_per_row()*8), dtype=np.uint8)
+        padded[:, :packed.shape[1]] = packed
+        self._board = padded.view('<u8')
+        self._outside = set()
+
+    @property
+    def active_cells(self) -> Set[Tuple[int, int]]:
+        """ The set of X,Y coordinates of all the live cells
+
+        :return: A new set built from the board.  Modifying it does not change the engine.
+        """
+        ys, xs = np.nonzero(self.to_array())
+        return set(zip(xs.tolist(), ys.tolist())).union(self._outside)
+
+    @active_cells.setter
+    def active_cells(self, cells: Set[Tuple[int, int]]):
+        """ Replace the board with the provided live cells
+
+        :param cells: X,Y coordinates of the live cells
+        :return:
+        """
+        self.clear()
+        coords = np.array(list(cells), dtype=np.int64).reshape(-1, 2)
+        on_board = (coords[:, 0] >= 0) & (coords[:, 0] <= self.x_max) & (coords[:, 1] >= 0) & (coords[:, 1] <= self.y_max)
+        self._set_bits(coords[on_board, 0], coords[on_board, 1])
+        self._outside = set(map(tuple, coords[~on_board].tolist()))
+
+    def _set_bits(self, xs: np.ndarray, ys: np.ndarray):
+        """ Turn on the bits for the provided on-board cells
+
+        :param xs: x coordinates
+        :param ys: y coordinates
+        :return:
+        """
+        bits = np.left_shift(np.uint64(1), (xs & 63).astype(np.uint64))
+        np.bitwise_or.at(self._board, (ys, xs >> 6), bits)
+
+    def is_active(self, x: int, y: int) -> int:
+        """ Whether the indicated cell is alive
+
+        :param x:
+        :param y:
+        :return: 1 if it is alive, 0 otherwise
+        """
+        if 0 <= x <= self.x_max and 0 <= y <= self.y_max:
+            return int((int(self._board[y, x >> 6]) >> (x & 63)) & 1)
+        return 1 if (x, y) in self._outside else 0
+
+    def clear(self):
+        """ Mark every cell as dead
+
+        :return:
+        """
+        self._board = np.zeros((self.y_max+1, self._words_per_row()), dtype='<u8')
+        self._outside = set()
+
+    def random(self, p: Union[float, int]):
+        """ Set some cells randomly to being alive
+
+        :param p: If in the range of 0 to 1, select that proportion of cells to make alive.  Otherwise treat as the
+        number of cells to make alive.
+        :return:
+        """
+        if p<1:
+            numcells = int(self.x_max*self.y_max*p)
+        else:
+            numcells = int(p)
+        self._set_bits(np.random.randint(0, self.x_max, numcells), np.random.randint(0, self.y_max, numcells))
+
+    @staticmethod
+    def _west(rows: np.ndarray) -> np.ndarray:
+        """ For each bit, the value of the cell at x-1 """
+        shifted = rows << np.uint64(1)
+        shifted[:, 1:] |= rows[:, :-1] >> np.uint64(63)
+        return shifted
+
+    @staticmethod
+    def _east(rows: np.ndarray) -> np.ndarray:
+        """ For each bit, the value of the cell at x+1 """
+        shifted = rows >> np.uint64(1)
+        shifted[:, :-1] |= rows[:, 1:] << np.uint64(63)
+        return shifted
+
+    def step(self, x_max: Optional[int] = None, y_max: Optional[int] = None):
+        """ Update the state.
+
+        Run one generation.
+
+        :param x_max: The largest x value for the visible board
+        :param y_max: The largest y value for the visible board
+        :return: In addition to updating the board, return the set of active cells.
+        """
+        x_max = self.x_max if x_max is None else x_max
+        y_max = self.y_max if y_max is None else y_max
+        if x_max != self.x_max or y_max != self.y_max:
+            cells = self.active_cells
+            self.x_max = x_max
+            self.y_max = y_max
+            self.active_cells = cells
+
+        # Off-board cells never come to life, but the ones touching the board can survive
+        new_outside = set([c for c in self._outside if self.num_active_neighbors(c[0], c[1]) in self.survival])
+
+        board = self._board
+        empty_row = np.zeros((1, board.shape[1]), dtype=board.dtype)
+        north = np.vstack([empty_row, board[:-1]])
+        south = np.vstack([board[1:], empty_row])
+
+        # Add up the eight neighbors into a 4 bit count
+        s_a, c_a = _full_add(self._west(north), north, self._east(north))
+        s_b, c_b = _full_add(self._west(south), south, self._east(south))
+        west, east = self._west(board), self._east(board)
+        s_c, c_c = west ^ east, west & east
+        ones, c_d = _full_add(s_a, s_b, s_c)
+        t, c_e = _full_add(c_a, c_b, c_c)
+        twos, c_f = t ^ c_d, t & c_d
+        planes = (ones, twos, c_e ^ c_f, c_e & c_f)
+
+        if self.birth == {3} and self.survival == {2, 3}:
+            new_board = twos & ~planes[2] & ~planes[3] & (ones | board)
+        else:
+            born = np.zeros_like(board)
+            survived = np.zeros_like(board)
+            for count in self.birth.union(self.survival):
+                matches = ~np.zeros_like(board)
+                for bit, plane in enumerate(planes):
+                    matches &= plane if (count >> bit) & 1 else ~plane
+                if count in self.birth:
+                    born |= matches
+                if count in self.survival:
+                    survived |= matches
+            new_board = (born & ~board) | (survived & board)
+        new_board[:, -1] &= self._last_word_mask()
+        self._board = new_board
+        self._outside = new_outside
+        return self.active_cells
+
+
+class _QuadNode:
+    """ An immutable quadtree node used by HashlifeGameOfLifeEngine
+
+    A node at level k covers a 2^k by 2^k square.  a, b, c and d are the top-left, top-right, bottom-left and
+    bottom-right quadrants (level k-1 nodes).  Level 0 nodes are single cells and have no quadrants.
+
+    """
+    __slots__ = ("k", "a", "b", "c", "d", "pop")
+
+    def __init__(self, k: int, a=None, b=None, c=None, d=None, pop: int = 0):
+        self.k = k
+        self.a = a
+        self.b = b
+        self.c = c
+        self.d = d
+        self.pop = pop
+
+
+class HashlifeGameOfLifeEngine(GameOfLifeEngine):
+    """ Game of Life implementation using Hashlife
+
+    The universe is stored as a quadtree where identical sub-squares are shared, and the result of advancing each
+    sub-square is memoized.  Highly regular patterns, like oscillators and spaceships, can then be advanced an
+    exponential number of generations at a time using advance(n).
+
+    Unlike the other engines, the universe is unbounded.  Cells are not clipped at x_max and y_max, so spaceships keep
+    flying after they leave the board.  step only returns the cells in the visible window (see window_cells), while
+    active_cells contains the whole universe.
+
+    The node and result caches are LRU caches limited to cache_size entries, so memory stays flat no matter how long the
+    engine runs.  Evicting a node only loses sharing and memoization; it never changes the results.
+
+    """
+    cache_size: int = 200000
+
+    def __init__(self, cache_size: Optional[int] = None):
+        """ Create a new HashlifeGameOfLifeEngine instance with an empty universe
+
+        :param cache_size: Maximum number of entries in each of the node and result caches
+        """
+        self.cache_size = self.cache_size if cache_size is None else cache_size
+        self._nodes = OrderedDict()
+        self._results = OrderedDict()
+        self._off = _QuadNode(0, pop=0)
+        self._on = _QuadNode(0, pop=1)
+        self._zeros = [self._off]
+        self.generation = 0
+        self.clear()
+
+    def set_rule(self, rule: str):
+        """ Change the rule used to compute successive states, discarding memoized results
+
+        :param rule: A Life-like rulestring such as "B3/S23" or "B36/S23" (see parse_rule)
+        :return:
+        """
+        super(HashlifeGameOfLifeEngine, self).set_rule(rule)
+        self._results.clear()
+
+    def _join(self, a: _QuadNode, b: _QuadNode, c: _QuadNode, d: _QuadNode) -> _QuadNode:
+        """ Get the canonical node made up of the four provided quadrants
+
+        """
+        key = (a, b, c, d)
+        node = self._nodes.get(key)
+        if node is None:
+            node = _QuadNode(a.k+1, a, b, c, d, a.pop+b.pop+c.pop+d.pop)
+            self._nodes[key] = node
+            if len(self._nodes) > self.cache_size:
+                self._nodes.popitem(last=False)
+        else:
+            self._nodes.move_to_end(key)
+        return node
+
+    def _zero(self, k: int) -> _QuadNode:
+        """ Get an empty node of level k
+
+        """
+        while len(self._zeros) <= k:
+            z = self._zeros[-1]
+            self._zeros.append(self._join(z, z, z, z))
+        return self._zeros[k]
+
+    def _centre(self, m: _QuadNode) -> _QuadNode:
+        """ Get a node one level up with m in the middle and empty space around it
+
+        """
+        z = self._zero(m.k-1)
+        return self._join(self._join(z, z, z, m.a), self._join(z, z, m.b, z),
+                          self._join(z, m.c, z, z), self._join(m.d, z, z, z))
+
+    def _is_padded(self, m: _QuadNode) -> bool:
+        """ Whether every live cell in m is in its central quarter
+
+        """
+        return m.k >= 2 and m.a.pop == m.a.d.pop and m.b.pop == m.b.c.pop and m.c.pop == m.c.b.pop \
+            and m.d.pop == m.d.a.pop
+
+    def _life_4x4(self, m: _QuadNode) -> _QuadNode:
+        """ Advance the centre 2x2 cells of a level 2 node by one generation
+
+        """
+        grid = [[m.a.a, m.a.b, m.b.a, m.b.b],
+                [m.a.c, m.a.d, m.b.c, m.b.d],
+                [m.c.a, m.c.b, m.d.a, m.d.b],
+                [m.c.c, m.c.d, m.d.c, m.d.d]]
+        ans = []
+        for y in (1, 2):
+            for x in (1, 2):
+                active_neighbors = sum([grid[y+yo][x+xo].pop for xo, yo in self.offsets])
+                if active_neighbors in (self.survival if grid[y][x].pop else self.birth):
+                    ans.append(self._on)
+                else:
+                    ans.append(self._off)
+        return self._join(*ans)
+
+    def _successor(self, m: _QuadNode, j: int) -> _QuadNode:
+        """ Advance the centre of m by 2^j generations
+
+        :param m: A node of level k>=2
+        :param j: The log2 of the number of generations.  Capped at k-2.
+        :return: The level k-1 node in the centre of m, 2^j generations later
+        """
+        if m.pop == 0:
+            return m.a
+        j = min(j, m.k-2)
+        key = (m, j)
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+            return result
+
+        if m.k == 2:
+            result = self._life_4x4(m)
+        else:
+            join = self._join
+            a, b, c, d = m.a, m.b, m.c, m.d
+            c1 = self._successor(a, j)
+            c2 = self._successor(join(a.b, b.a, a.d, b.c), j)
+            c3 = self._successor(b, j)
+            c4 = self._successor(join(a.c, a.d, c.a, c.b), j)
+            c5 = self._successor(join(a.d, b.c, c.b, d.a), j)
+            c6 = self._successor(join(b.c, b.d, d.a, d.b), j)
+            c7 = self._successor(c, j)
+            c8 = self._successor(join(c.b, d.a, c.d, d.c), j)
+            c9 = self._successor(d, j)
+            if j < m.k-2:
+                result = join(join(c1.d, c2.c, c4.b, c5.a), join(c2.d, c3.c, c5.b, c6.a),
+                              join(c4.d, c5.c, c7.b, c8.a), join(c5.d, c6.c, c8.b, c9.a))
+            else:
+                result = join(self._successor(join(c1, c2, c4, c5), j), self._successor(join(c2, c3, c5, c6), j),
+                              self._successor(join(c4, c5, c7, c8), j), self._successor(join(c5, c6, c8, c9), j))
+
+        self._results[key] = result
+        if len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+        return result
+
+    def _build(self, xs: np.ndarray, ys: np.ndarray, k: int) -> _QuadNode:
+        """ Build the node of level k for the cells with coordinates relative to the node's top-left corner
+
+        """
+        if len(xs) == 0:
+            return self._zero(k)
+        if k == 0:
+            return self._on
+        half = 1 << (k-1)
+        right = xs >= half
+        bottom = ys >= half
+        quadrants = []
+        for mask, xo, yo in ((~right & ~bottom, 0, 0), (right & ~bottom, half, 0),
+                             (~right & bottom, 0, half), (right & bottom, half, half)):
+            quadrants.append(self._build(xs[mask]-xo, ys[mask]-yo, k-1))
+        return self._join(*quadrants)
+
+    @property
+    def population(self) -> int:
+        """ The number of live cells in the universe
+
+        """
+        return self._root.pop
+
+    @property
+    def active_cells(self) -> Set[Tuple[int, int]]:
+        """ The set of X,Y coordinates of all the live cells in the universe
+
+        :return: A new set built from the quadtree.  Modifying it does not change the engine.
+        """
+        size = 1 << self._root.k
+        return self.window_cells(self._origin[0], self._origin[1], self._origin[0]+size-1, self._origin[1]+size-1)
+
+    @active_cells.setter
+    def active_cells(self, cells: Set[Tuple[int, int]]):
+        """ Replace the universe with the provided live cells
+
+        :param cells: X,Y coordinates of the live cells
+        :return:
+        """
+        coords = np.array(list(cells), dtype=np.int64).reshape(-1, 2)
+        if len(coords) == 0:
+            self.clear()
+            return
+        min_x, min_y = coords.min(axis=0)
+        extent = int(max(coords.max(axis=0) - coords.min(axis=0))) + 1
+        k = max(2, int(extent-1).bit_length())
+        self._root = self._build(coords[:, 0]-min_x, coords[:, 1]-min_y, k)
+        self._origin = (int(min_x), int(min_y))
+
+    def window_cells(self, x0: int, y0: int, x1: int, y1: int) -> Set[Tuple[int, int]]:
+        """ Get the live cells in a rectangular window, without visiting any part of the universe outside of it
+
+        :param x0: smallest x value in the window
+        :param y0: smallest y value in the window
+        :param x1: largest x value in the window
+        :param y1: largest y value in the window
+        :return: Set of X,Y coordinates of the live cells in the window
+        """
+        ans = set()
+        stack = [(self._root, self._origin[0], self._origin[1])]
+        while stack:
+            node, x, y = stack.pop()
+            size = 1 << node.k
+            if node.pop == 0 or x > x1 or y > y1 or x+size-1 < x0 or y+size-1 < y0:
+                continue
+            if node.k == 0:
+                ans.add((x, y))
+            else:
+                half = size >> 1
+                stack.extend([(node.a, x, y), (node.b, x+half, y), (node.c, x, y+half), (node.d, x+half, y+half)])
+        return ans
+
+    def is_active(self, x: int, y: int) -> int:
+        """ Whether the indicated cell is alive
+
+        :param x:
+        :param y:
+        :return: 1 if it is alive, 0 otherwise
+        """
+        return len(self.window_cells(x, y, x, y))
+
+    def clear(self):
+        """ Mark every cell as dead
+
+        :return:
+        """
+        self._root = self._zero(2)
+        self._origin = (0, 0)
+
+    def random(self, p: Union[float, int]):
+        """ Set some cells randomly to being alive
+
+        :param p: If in the range of 0 to 1, select that proportion of cells to make alive.  Otherwise treat as the
+        number of cells to make alive.
+        :return:
+        """
+        if p<1:
+            numcells = int(self.x_max*self.y_max*p)
+        else:
+            numcells = int(p)
+        new_cells = zip(np.random.randint(0, self.x_max, numcells).tolist(), np.random.randint(0, self.y_max, numcells).tolist())
+        self.active_cells = self.active_cells.union(new_cells)
+
+    def _advance_pow2(self, j: int):
+        """ Advance the universe by 2^j generations
+
+        :param j:
+        :return:
+        """
+        root, (x, y) = self._root, self._origin
+        # Pad until the pattern can't grow past the edge of the result within 2^j generations
+        while root.k < j+2 or not self._is_padded(root):
+            x -= 1 << (root.k-1)
+            y -= 1 << (root.k-1)
+            root = self._centre(root)
+        x -= 1 << (root.k-1)
+        y -= 1 << (root.k-1)
+        root = self._centre(root)
+        self._root = self._successor(root, j)
+        self._origin = (x + (1 << (root.k-2)), y + (1 << (root.k-2)))
+
+    def advance(self, n: int):
+        """ Jump ahead n generations
+
+        This takes time roughly proportional to log(n) for regular patterns.
+
+        :param n: The number of generations to advance
+        :return:
+        """
+        for j in range(n.bit_length()):
+            if (n >> j) & 1:
+                self._advance_pow2(j)
+        self.generation += n
+
+    def step(self, x_max: Optional[int] = None, y_max: Optional[int] = None):
+        """ Update the state.
+
+        Run one generation.
+
+        :param x_max: The largest x value for the visible board
+        :param y_max: The largest y value for the visible board
+        :return: The set of active cells in the visible board.  Cells outside of it are still simulated.
+        """
+        self.x_max = self.x_max if x_max is None else x_max
+        self.y_max = self.y_max if y_max is None else y_max
+        self.advance(1)
+        return self.window_cells(0, 0, self.x_max, self.y_max)
+
+
+class IncrementalGameOfLifeEngine(GameOfLifeEngine):
+    """ Game of Life implementation that only re-examines cells near the last generation's changes
+
+    A cell can only change state if it, or one of its neighbors, changed state in the previous generation.  This
+    engine keeps track of those changes so that, on a mostly settled board, the cost of a step depends on the amount of
+    activity instead of the number of live cells.
+
+    After each step, births and deaths contain the cells that came to life and died in that generation.  If the live
+    cells were set some other way since the previous step (assigning active_cells, clear, random), births and deaths
+    are None since the change from what was last returned by step is not known.
+
+    The rules, including the clipped-edge behavior of all_neighbors, are exactly the same as GameOfLifeEngine.
+
+    """
+
+    def __init__(self):
+        """ Create a new IncrementalGameOfLifeEngine instance with an empty board
+
+        """
+        self._cells = set()
+        self._changed = set()
+        self._modified = False
+        self.births = None
+        self.deaths = None
+
+    @property
+    def active_cells(self) -> Set[Tuple[int, int]]:
+        """ The set of X,Y coordinates of all the live cells
+
+        Assign a new set rather than modifying this one so that the engine knows that every cell has to be re-examined.
+
+        :return:
+        """
+        return self._cells
+
+    @active_cells.setter
+    def active_cells(self, cells: Set[Tuple[int, int]]):
+        """ Replace the live cells, and re-examine every cell on the next step
+
+        :param cells: X,Y coordinates of the live cells
+        :return:
+        """
+        self._cells = set(cells)
+        self._changed = set(self._cells)
+        self._modified = True
+
+    def is_active(self, x: int, y: int) -> int:
+        """ Whether the indicated cell is alive
+
+        :param x:
+        :param y:
+        :return: 1 if it is alive, 0 otherwise
+        """
+        return 1 if (x, y) in self._cells else 0
+
+    def random(self, p: Union[float, int]):
+        """ Set some cells randomly to being alive
+
+        :param p: If in the range of 0 to 1, select that proportion of cells to make alive.  Otherwise treat as the
+        number of cells to make alive.
+        :return:
+        """
+        if p<1:
+            numcells = int(self.x_max*self.y_max*p)
+        else:
+            numcells = int(p)
+        new_cells = set([(np.random.randint(0, self.x_max), np.random.randint(0, self.y_max)) for _ in range(0, numcells)])
+        self._changed.update(new_cells.difference(self._cells))
+        self._cells.update(new_cells)
+        self._modified = True
+
+    def step(self, x_max: Optional[int] = None, y_max: Optional[int] = None):
+        """ Update the state.
+
+        Run one generation, setting births and deaths.
+
+        :param x_max: The largest x value for the visible board
+        :param y_max: The largest y value for the visible board
+        :return: In addition to setting the local active_cells variable, return the set of active cells.
+        """
+        x_max = self.x_max if x_max is None else x_max
+        y_max = self.y_max if y_max is None else y_max
+        if x_max != self.x_max or y_max != self.y_max:
+            # Clipping at the edges changes, so everything has to be re-examined
+            self.x_max = x_max
+            self.y_max = y_max
+            self._changed = set(self._cells)
+
+        candidates = set(self._changed)
+        for c in self._changed:
+            candidates.update([(c[0]+xo, c[1]+yo) for xo, yo in self.offsets])
+
+        births = set()
+        deaths = set()
+        for c in candidates:
+            active_neighbors = self.num_active_neighbors(c[0], c[1])
+            if c in self._cells:
+                if active_neighbors not in self.survival:
+                    deaths.add(c)
+            elif active_neighbors in self.birth and 0 <= c[0] <= self.x_max and 0 <= c[1] <= self.y_max:
+                births.add(c)
+
+        self._cells.difference_update(deaths)
+        self._cells.update(births)
+        self._changed = births.union(deaths)
+        self.births = None if self._modified else births
+        self.deaths = None if self._modified else deaths
+        self._modified = False
+        return self._cells
+
+
+class TiledGameOfLifeEngine(GameOfLifeEngine):
+    """ Game of Life implementation that splits the universe into tiles
+
+    Live cells are stored in tile_size by tile_size NumPy arrays (indexed [y, x]) kept in a dict keyed by tile
+    coordinate.  Only tiles that exist are stored, so large, mostly empty boards are cheap.  A tile can only change if
+    it or one of the eight tiles around it changed in the previous generation, so settled or empty regions are skipped
+    entirely.  Tiles that become empty are freed.
+
+    The rules, including the clipped-edge behavior of all_neighbors, are exactly the same as GameOfLifeEngine.  After
+    each step, examined_tiles is the number of tiles that were computed.
+
+    """
+    tile_size: int = 32
+
+    def __init__(self, tile_size: Optional[int] = None):
+        """ Create a new TiledGameOfLifeEngine instance with an empty board
+
+        :param tile_size: The width and height of each tile
+        """
+        self.tile_size = self.tile_size if tile_size is None else tile_size
+        self._tiles = {}
+        self._changed = set()
+        self.examined_tiles = 0
+
+    @property
+    def active_cells(self) -> Set[Tuple[int, int]]:
+        """ The set of X,Y coordinates of all the live cells
+
+        :return: A new set built from the tiles.  Modifying it does not change the engine.
+        """
+        ans = set()
+        for (tx, ty), tile in self._tiles.items():
+            ys, xs = np.nonzero(tile)
+            ans.update(zip((xs + tx*self.tile_size).tolist(), (ys + ty*self.tile_size).tolist()))
+        return ans
+
+    @active_cells.setter
+    def active_cells(self, cells: Set[Tuple[int, int]]):
+        """ Replace the board with the provided live cells
+
+        :param cells: X,Y coordinates of the live cells
+        :return:
+        """
+        self.clear()
+        self._add_cells(np.array(list(cells), dtype=np.int64).reshape(-1, 2))
+
+    def _add_cells(self, coords: np.ndarray):
+        """ Mark the provided cells as alive
+
+        :param coords: N x 2 array of X,Y coordinates
+        :return:
+        """
+        tile_coords = coords // self.tile_size
+        local = coords - tile_coords*self.tile_size
+        for key in set(map(tuple, tile_coords.tolist())):
+            in_tile = (tile_coords[:, 0] == key[0]) & (tile_coords[:, 1] == key[1])
+            tile = self._tiles.setdefault(key, np.zeros((self.tile_size, self.tile_size), dtype=np.uint8))
+            tile[local[in_tile, 1], local[in_tile, 0]] = 1
+            self._changed.add(key)
+
+    def is_active(self, x: int, y: int) -> int:
+        """ Whether the indicated cell is alive
+
+        :param x:
+        :param y:
+        :return: 1 if it is alive, 0 otherwise
+        """
+        tile = self._tiles.get((x // self.tile_size, y // self.tile_size))
+        return 0 if tile is None else int(tile[y % self.tile_size, x % self.tile_size])
+
+    def clear(self):
+        """ Mark every cell as dead
+
+        :return:
+        """
+        self._tiles = {}
+        self._changed = set()
+
+    def random(self, p: Union[float, int]):
+        """ Set some cells randomly to being alive
+
+        :param p: If in the range of 0 to 1, select that proportion of cells to make alive.  Otherwise treat as the
+        number of cells to make alive.
+        :return:
+        """
+        if p<1:
+            numcells = int(self.x_max*self.y_max*p)
+        else:
+            numcells = int(p)
+        self._add_cells(np.column_stack([np.random.randint(0, self.x_max, numcells), np.random.randint(0, self.y_max, numcells)]))
+
+    def _halo(self, tx: int, ty: int) -> np.ndarray:
+        """ Get the tile with a one cell border taken from the tiles around it
+
+        :param tx: tile x coordinate
+        :param ty: tile y coordinate
+        :return: (tile_size+2) x (tile_size+2) array
+        """
+        n = self.tile_size
+        halo = np.zeros((n+2, n+2), dtype=np.uint8)
+        for xo, yo in self.offsets.union({(0, 0)}):
+            tile = self._tiles.get((tx+xo, ty+yo))
+            if tile is None:
+                continue
+            # The slice of the neighboring tile that falls inside the halo, and where it goes
+            src_x = slice(0, n) if xo == 0 else (slice(0, 1) if xo == 1 else slice(n-1, n))
+            src_y = slice(0, n) if yo == 0 else (slice(0, 1) if yo == 1 else slice(n-1, n))
+            dst_x = slice(1, n+1) if xo == 0 else (slice(n+1, n+2) if xo == 1 else slice(0, 1))
+            dst_y = slice(1, n+1) if yo == 0 else (slice(n+1, n+2) if yo == 1 else slice(0, 1))
+            halo[dst_y, dst_x] = tile[src_y, src_x]
+        return halo
+
+    def _step_tile(self, tx: int, ty: int) -> np.ndarray:
+        """ Compute the next generation of a tile
+
+        :param tx: tile x coordinate
+        :param ty: tile y coordinate
+        :return: The new tile
+        """
+        n = self.tile_size
+        halo = self._halo(tx, ty)
+        x0 = tx*n
+        y0 = ty*n
+        if x0 < 1 or y0 < 1 or x0+n > self.x_max or y0+n > self.y_max:
+            # Near the edge, cells off the board don't count as neighbors and can't come to life
+            xs = np.arange(x0-1, x0+n+1)
+            ys = np.arange(y0-1, y0+n+1)
+            on_board = ((ys >= 0) & (ys <= self.y_max))[:, None] & ((xs >= 0) & (xs <= self.x_max))[None, :]
+            alive = halo[1:-1, 1:-1].copy()
+            indexes = (neighborhood_index(halo & on_board) & ~np.uint16(16)) | (alive.astype(np.uint16) << 4)
+            return self.rule_table[indexes] & (on_board[1:-1, 1:-1] | alive)
+        return self.rule_table[neighborhood_index(halo)]
+
+    def step(self, x_max: Optional[int] = None, y_max: Optional[int] = None):
+        """ Update the state.
+
+        Run one generation.
+
+        :param x_max: The largest x value for the visible board
+        :param y_max: The largest y value for the visible board
+        :return: In addition to updating the tiles, return the set of active cells.
+        """
+        x_max = self.x_max if x_max is None else x_max
+        y_max = self.y_max if y_max is None else y_max
+        if x_max != self.x_max or y_max != self.y_max:
+            # Clipping at the edges changes, so every tile has to be re-examined
+            self.x_max = x_max
+            self.y_max = y_max
+            self._changed = set(self._tiles.keys())
+
+        candidates = set()
+        for tx, ty in self._changed:
+            candidates.update([(tx+xo, ty+yo) for xo, yo in self.offsets.union({(0, 0)})])
+
+        new_tiles = {}
+        changed = set()
+        for key in candidates:
+            old_tile = self._tiles.get(key)
+            new_tile = self._step_tile(key[0], key[1])
+            if old_tile is None:
+                if new_tile.any():
+                    new_tiles[key] = new_tile
+                    changed.add(key)
+            elif not np.array_equal(old_tile, new_tile):
+                new_tiles[key] = new_tile
+                changed.add(key)
+        for key in changed:
+            if new_tiles[key].any():
+                self._tiles[key] = new_tiles[key]
+            else:
+                del self._tiles[key]
+        self._changed = changed
+        self.examined_tiles = len(candidates)
+        return self.active_cells
+
+
+# Shared memory blocks attached by the current worker process, keyed by name
+_worker_buffers = {}
+
+
+def _attach_board(name: str, shape: Tuple[int, int]) -> np.ndarray:
+    """ Get a board stored in a shared memory block, attaching to the block the first time it is seen
+
+    :param name: Name of the shared memory block
+    :param shape: (height, width) of the board
+    :return: uint8 array backed by the shared memory
+    """
+    if name not in _worker_buffers:
+        _worker_buffers[name] = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=np.uint8, buffer=_worker_buffers[name].buf)
+
+
+def _step_stripe(task: Tuple[str, str, int, int, int, int, np.ndarray]):
+    """ Compute the next generation for rows y0 to y1-1 of a shared board.  Run in a worker process.
+
+    The row above and below the stripe (the halo) are read directly from the shared source board.
+
+    :param task: (source block name, destination block name, height, width, y0, y1, rule_table)
+    :return:
+    """
+    src_name, dst_name, height, width, y0, y1, rule_table = task
+    for name in list(_worker_buffers.keys()):
+        if name not in (src_name, dst_name):
+            _worker_buffers.pop(name).close()
+    src = _attach_board(src_name, (height, width))
+    dst = _attach_board(dst_name, (height, width))
+    lo = max(y0-1, 0)
+    hi = min(y1+1, height)
+    padded = np.zeros((y1-y0+2, width+2), dtype=np.uint8)
+    padded[lo-y0+1:hi-y0+1, 1:-1] = src[lo:hi]
+    dst[y0:y1] = rule_table[neighborhood_index(padded)]
+
+
+class ParallelGameOfLifeEngine(DenseGameOfLifeEngine):
+    """ Game of Life implementation that steps horizontal stripes of the board on multiple cores
+
+    The board is kept in a pair of multiprocessing.shared_memory blocks, one for the current generation and one for the
+    next, so nothing is pickled between generations.  Each worker computes a stripe of rows, reading the row above and
+    below its stripe directly from the current board.  The blocks then trade places.
+
+    Boards with fewer than parallel_threshold cells are stepped on the calling thread, since the cost of coordinating
+    the workers is larger than the work itself.  Either way, the results are exactly the same as GameOfLifeEngine.
+
+    Call close() when the engine is no longer needed to stop the workers and free the shared memory.
+
+    """
+    parallel_threshold: int = 100000
+
+    def __init__(self, workers: Optional[int] = None, parallel_threshold: Optional[int] = None):
+        """ Create a new ParallelGameOfLifeEngine instance with an empty board
+
+        :param workers: Number of worker processes.  Defaults to the number of cores.
+        :param parallel_threshold: Boards with fewer cells than this are stepped on the calling thread
+        """
+        super(ParallelGameOfLifeEngine, self).__init__()
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.parallel_threshold = self.parallel_threshold if parallel_threshold is None else parallel_threshold
+        self._pool = None
+        self._shared = []
+        self._shared_boards = []
+
+    def _share_board(self):
+        """ Make sure the current board lives in the first shared memory block
+
+        :return:
+        """
+        if len(self._shared_boards) > 0 and self._board is self._shared_boards[0]:
+            return
+        if len(self._shared_boards) == 0 or self._shared_boards[0].shape != self._board.shape:
+            self._free_shared()
+            for _ in range(2):
+                block = shared_memory.SharedMemory(create=True, size=max(1, self._board.size))
+                self._shared.append(block)
+                self._shared_boards.append(np.ndarray(self._board.shape, dtype=np.uint8, buffer=block.buf))
+        self._shared_boards[0][:] = self._board
+        self._board = self._shared_boards[0]
+
+    def _free_shared(self):
+        """ Release the shared memory blocks
+
+        :return:
+        """
+        if len(self._shared_boards) > 0 and any(self._board is b for b in self._shared_boards):
+            self._board = self._board.copy()
+        self._shared_boards = []
+        for block in self._shared:
+            block.close()
+            block.unlink()
+        self._shared = []
+
+    def close(self):
+        """ Stop the worker processes and free the shared memory
+
+        :return:
+        """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        self._free_shared()
+
+    def step(self, x_max: Optional[int] = None, y_max: Optional[int] = None):
+        """ Update the state.
+
+        Run one generation, in parallel if the board is large enough.
+
+        :param x_max: The largest x value for the visible board
+        :param y_max: The largest y value for the visible board
+        :return: In addition to updating the board, return the set of active cells.
+        """
+        x_max = self.x_max if x_max is None else x_max
+        y_max = self.y_max if y_max is None else y_max
+        if self.workers <= 1 or (x_max+1)*(y_max+1) < self.parallel_threshold:
+            return super(ParallelGameOfLifeEngine, self).step(x_max, y_max)
+        if x_max != self.x_max or y_max != self.y_max:
+            self._resize(x_max, y_max)
+
+        # Off-board cells never come to life, but the ones touching the board can survive
+        new_outside = set([c for c in self._outside if self.num_active_neighbors(c[0], c[1]) in self.survival])
+
+        self._share_board()
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.workers)
+        height, width = self._board.shape
+        bounds = np.linspace(0, height, min(self.workers, height)+1).astype(int)
+        tasks = [(self._shared[0].name, self._shared[1].name, height, width, int(y0), int(y1), self.rule_table)
+                 for y0, y1 in zip(bounds[:-1], bounds[1:]) if y1 > y0]
+        self._pool.map(_step_stripe, tasks)
+
+        self._shared.reverse()
+        self._shared_boards.reverse()
+        self._board = self._shared_boards[0]
+        self._outside = new_outside
+        return self.active_cells
+
+
+# The engines that GameOfLifePanel can use, keyed by the name used for its engine property
+engines = {
+    "set": GameOfLifeEngine,
+    "dense": DenseGameOfLifeEngine,
+    "bitboard": BitboardGameOfLifeEngine,
+    "hashlife": HashlifeGameOfLifeEngine,
+    "incremental": IncrementalGameOfLifeEngine,
+    "tiled": TiledGameOfLifeEngine,
+    "parallel": ParallelGameOfLifeEngine
+}
+
+
+class DeltaPixelatedGrid(PixelatedGrid):
+    """ A PixelatedGrid that can also be updated with just the cells that changed
+
+    Setting activated_cells redraws the whole grid.  apply_delta only adds and removes the rectangles for the cells
+    that changed, which is much cheaper when only a small part of the board changes each generation.
+
+    """
+
+    def __init__(self, **kwargs):
+        self._cell_rects = {}
+        self._cell_group = InstructionGroup()
+        super(DeltaPixelatedGrid, self).__init__(**kwargs)
+
+    def _cell_rect(self, x: int, y: int) -> Rectangle:
+        return Rectangle(pos=[self.x+x*self.cell_length, self.y+self.height-(y+1)*self.cell_length],
+                         size=[self.cell_length, self.cell_length])
+
+    def update_canvas(self, *args):
+        """ Clears and redraws the canvas, keeping track of the rectangle drawn for each activated cell
+
+        :param args:
+        :return:
+        """
+        self.canvas.clear()
+        with self.canvas:
+            Color(*self.background_color)
+            Rectangle(pos = [self.x,self.y], size=[self.width, self.height])
+            Color(*self.grid_color)
+            for x in range(0, int(self.width), self.cell_length):
+                Line(points=[self.x + x, self.y, self.x + x, self.y + int(self.height)], width=1)
+            for y in range(int(self.height), 0, -self.cell_length):
+                Line(points=[self.x, self.y + y, self.x + int(self.width), self.y + y], width=1)
+        self._cell_group = InstructionGroup()
+        self._cell_group.add(Color(*self.activated_color))
+        self._cell_rects = {}
+        for x, y in self.activated_cells:
+            self._cell_rects[(x, y)] = self._cell_rect(x, y)
+            self._cell_group.add(self._cell_rects[(x, y)])
+        self.canvas.add(self._cell_group)
+
+    def apply_delta(self, births: Set[Tuple[int, int]], deaths: Set[Tuple[int, int]]):
+        """ Activate and deactivate the specified cells without redrawing the rest of the grid
+
+        :param births: cells to activate
+        :param deaths: cells to deactivate
+        :return:
+        """
+        for c in deaths:
+            rect = self._cell_rects.pop(c, None)
+            if rect is not None:
+                self._cell_group.remove(rect)
+        for c in births:
+            if c not in self._cell_rects:
+                self._cell_rects[c] = self._cell_rect(c[0], c[1])
+                self._cell_group.add(self._cell_rects[c])
+        # Modified in place so that the grid isn't redrawn from scratch
+        self.activated_cells.difference_update(deaths)
+        self.activated_cells.update(births)
+
+
 Builder.load_string('''
 <GameOfLifePanel>:
     orientation: 'vertical'
@@ -259,7 +1483,7 @@ Builder.load_string('''
             id: menu_btn
             text: 'Patterns'
             on_release: root.choose_patterns()
-    PixelatedGrid:
+    DeltaPixelatedGrid:
         id: grid  
         size_hint: 1,1  
         activated_color: root.activated_color
@@ -281,6 +1505,10 @@ class GameOfLifePanel(BoxLayout):
     * grid_color - RGBA for the grid lines
     * activated_color - RGBA for the active cell color
     * cell_length - the length of the side of a cell (essentially cell size)
+    * engine - the name of the engine implementation to use (see engines).  "set" (default), "dense", "bitboard",
+      "hashlife", "incremental", "tiled" or "parallel".  With "incremental", only the cells that changed are redrawn each
+      generation.
+    * rule - the Life-like rule in B/S notation, such as "B3/S23" (default) or "B36/S23" (HighLife)
 
     """
     gol: GameOfLifeEngine
@@ -293,6 +1521,8 @@ class GameOfLifePanel(BoxLayout):
     update_event = None
     update_rate = NumericProperty(0.1)
     random_cell_count = NumericProperty(0.2)
+    engine = StringProperty("set")
+    rule = StringProperty("B3/S23")
 
     def __init__(self, **kwargs):
         """ Create a new GameOfLifePanel instance
@@ -311,6 +1541,31 @@ class GameOfLifePanel(BoxLayout):
             b.bind(on_release = lambda btn: self.set_pattern(btn.text))
             self.pattern_dropdown.add_widget(b)
 
+    def on_engine(self, instance, value):
+        """ Switch to a different engine implementation, keeping the current live cells
+
+        :param instance: Unused
+        :param value: The name of the new engine in engines
+        :return:
+        """
+        new_gol = engines[value]()
+        new_gol.x_max = self.gol.x_max
+        new_gol.y_max = self.gol.y_max
+        new_gol.active_cells = self.gol.active_cells
+        new_gol.set_rule(self.gol.rule)
+        if has_method(self.gol, "close"):
+            self.gol.close()
+        self.gol = new_gol
+
+    def on_rule(self, instance, value):
+        """ Use a different Life-like rule
+
+        :param instance: Unused
+        :param value: The rulestring
+        :return:
+        """
+        self.gol.set_rule(value)
+
     def choose_patterns(self, *args):
         self.pattern_dropdown.open(self.ids.menu_btn)
 
@@ -327,21 +1582,47 @@ class GameOfLifePanel(BoxLayout):
 
     def set_pattern(self, pattern_name):
         self.pattern_dropdown.select(None)
+        self.center_pattern(initial_patterns[pattern_name])
+
+    def center_pattern(self, pattern: Set[Tuple[int, int]]):
+        """ Clear the grid and place a pattern in the middle of it
+
+        :param pattern: The live cells of the pattern
+        :return:
+        """
         self.gol.clear()
-        pattern = initial_patterns[pattern_name]
         pattern_xt = int((self.ids.grid.visible_width()/2)-(max([p[0] for p in pattern])-min([p[0] for p in pattern]))/2)
         pattern_yt = int((self.ids.grid.visible_height()/2)-(max([p[1] for p in pattern])-min([p[1] for p in pattern]))/2)
-        self.gol.active_cells = translate(initial_patterns[pattern_name], pattern_xt, pattern_yt)
+        self.gol.active_cells = translate(pattern, pattern_xt, pattern_yt)
+
+    def load_rle(self, rle_text: str):
+        """ Clear the grid and place an RLE pattern in the middle of it
+
+        If the RLE header specifies a rule (for example "x = 3, y = 3, rule = B36/S23"), switch to that rule.
+        Otherwise, use B3/S23.
+
+        :param rle_text: The pattern in RLE format
+        :return:
+        """
+        self.rule = rle_rule(rle_text)
+        self.center_pattern(rle_decode(rle_text))
 
 
     def gol_update(self, *args):
         """ Move the engine ahead one generation, passing in the current size of the grid
 
+        If the engine reports which cells were born and died, only those cells are redrawn.
+
         :param args: Unused
         :return:
         """
         new_state = self.gol.step(self.ids.grid.visible_width(), self.ids.grid.visible_height())
-        self.ids.grid.activated_cells = new_state
+        births = getattr(self.gol, "births", None)
+        deaths = getattr(self.gol, "deaths", None)
+        if births is not None and deaths is not None:
+            self.ids.grid.apply_delta(births, deaths)
+        else:
+            self.ids.grid.activated_cells = set(new_state)
 
     def new_random(self, p: Union[float, int], *args):
         """ Clear the grid and add a random number of living cells
@@ -1,4 +1,6 @@
-from datapanels.gameoflife import GameOfLifeEngine, vertical_flip, horizontal_flip, translate, rotate_90, rle_decode
+import numpy as np
+import pytest
+from datapanels.gameoflife import GameOfLifeEngine, DenseGameOfLifeEngine, BitboardGameOfLifeEngine, HashlifeGameOfLifeEngine, IncrementalGameOfLifeEngine, TiledGameOfLifeEngine, ParallelGameOfLifeEngine, vertical_flip, horizontal_flip, translate, rotate_90, rle_decode, parse_rule, compile_rule, rle_rule
 
 
 def test_gameoflifeengine_step():
@@ -39,6 +41,205 @@ def test_gameoflifeengine_clear():
     assert len(gol.active_cells) >0
 
 
+def test_densegameoflifeengine_step():
+    gol = DenseGameOfLifeEngine()
+    gol.active_cells = {(0, 1), (1, 1), (2, 1)}
+    gol.step(2, 2)
+    assert gol.active_cells == {(1, 0), (1, 1), (1, 2)}
+    gol.step(2, 2)
+    assert gol.active_cells == {(0, 1), (1, 1), (2, 1)}
+
+    gol = DenseGameOfLifeEngine()
+    gol.active_cells = {(0, 1), (1, 1), (2, 1)}
+    gol.step(2, 1)
+    assert gol.active_cells == {(1, 0), (1,1)}
+    gol.step(2, 1)
+    assert gol.active_cells == set()
+
+
+def test_densegameoflifeengine_matches_set_engine():
+    np.random.seed(42)
+    cells = set(zip(np.random.randint(-2, 33, 400).tolist(), np.random.randint(-2, 23, 400).tolist()))
+    gol = GameOfLifeEngine()
+    gol.active_cells = set(cells)
+    dense = DenseGameOfLifeEngine()
+    dense.active_cells = set(cells)
+    for i in range(30):
+        # Shrink the board part way through so cells end up off the board
+        x_max, y_max = (30, 20) if i < 15 else (25, 18)
+        assert dense.step(x_max, y_max) == gol.step(x_max, y_max)
+        assert dense.is_active(3, 3) == gol.is_active(3, 3)
+
+
+def test_bitboardgameoflifeengine_matches_set_engine():
+    np.random.seed(7)
+    # Wide enough that the board spans several words per row
+    cells = set(zip(np.random.randint(-2, 150, 1500).tolist(), np.random.randint(-2, 23, 1500).tolist()))
+    gol = GameOfLifeEngine()
+    gol.active_cells = set(cells)
+    bitboard = BitboardGameOfLifeEngine()
+    bitboard.active_cells = set(cells)
+    assert bitboard.active_cells == cells
+    for i in range(30):
+        x_max, y_max = (147, 20) if i < 15 else (127, 18)
+        assert bitboard.step(x_max, y_max) == gol.step(x_max, y_max)
+        assert bitboard.is_active(64, 3) == gol.is_active(64, 3)
+
+
+def test_hashlifegameoflifeengine_advance():
+    np.random.seed(1)
+    cells = set(zip(np.random.randint(0, 20, 120).tolist(), np.random.randint(0, 20, 120).tolist()))
+    # The hashlife universe is unbounded, so compare against a set engine with a board far larger than the pattern
+    gol = GameOfLifeEngine()
+    gol.active_cells = translate(cells, 500, 500)
+    hashlife = HashlifeGameOfLifeEngine(cache_size=500)
+    hashlife.active_cells = cells
+    generation = 0
+    for n in [1, 2, 5, 13, 19]:
+        hashlife.advance(n)
+        for _ in range(n):
+            gol.step(1000, 1000)
+        generation += n
+        assert hashlife.active_cells == translate(gol.active_cells, -500, -500)
+        assert hashlife.generation == generation
+    assert hashlife.step(5, 5) == {c for c in hashlife.active_cells if 0 <= c[0] <= 5 and 0 <= c[1] <= 5}
+
+    # A glider moves one cell diagonally every 4 generations
+    hashlife = HashlifeGameOfLifeEngine()
+    hashlife.active_cells = rle_decode("bob$2bo$3o!")
+    hashlife.advance(4*1000)
+    assert hashlife.active_cells == translate(rle_decode("bob$2bo$3o!"), 1000, 1000)
+
+
+def test_incrementalgameoflifeengine_matches_set_engine():
+    np.random.seed(3)
+    cells = set(zip(np.random.randint(-2, 33, 300).tolist(), np.random.randint(-2, 23, 300).tolist()))
+    gol = GameOfLifeEngine()
+    gol.active_cells = set(cells)
+    incremental = IncrementalGameOfLifeEngine()
+    incremental.active_cells = set(cells)
+    previous = set(cells)
+    for i in range(40):
+        x_max, y_max = (30, 20) if i < 20 else (25, 18)
+        assert incremental.step(x_max, y_max) == gol.step(x_max, y_max)
+        if i == 0:
+            assert incremental.births is None and incremental.deaths is None
+        else:
+            assert incremental.births == gol.active_cells - previous
+            assert incremental.deaths == previous - gol.active_cells
+        previous = set(gol.active_cells)
+
+    incremental.active_cells = {(0, 1), (1, 1), (2, 1)}
+    incremental.step(2, 2)
+    assert incremental.births is None
+    incremental.step(2, 2)
+    assert incremental.births == {(0, 1), (2, 1)} and incremental.deaths == {(1, 0), (1, 2)}
+
+
+def test_tiledgameoflifeengine_matches_set_engine():
+    np.random.seed(5)
+    cells = set(zip(np.random.randint(-2, 70, 800).tolist(), np.random.randint(-2, 40, 800).tolist()))
+    gol = GameOfLifeEngine()
+    gol.active_cells = set(cells)
+    tiled = TiledGameOfLifeEngine(tile_size=16)
+    tiled.active_cells = set(cells)
+    assert tiled.active_cells == cells
+    for i in range(40):
+        x_max, y_max = (67, 37) if i < 20 else (50, 30)
+        assert tiled.step(x_max, y_max) == gol.step(x_max, y_max)
+        assert tiled.is_active(20, 20) == gol.is_active(20, 20)
+
+
+def test_tiledgameoflifeengine_skips_dormant_tiles():
+    tiled = TiledGameOfLifeEngine(tile_size=16)
+    # A block (still life) and a blinker far away from each other
+    tiled.active_cells = {(5, 5), (6, 5), (5, 6), (6, 6), (100, 100), (101, 100), (102, 100)}
+    tiled.step(200, 200)
+    tiled.step(200, 200)
+    assert tiled.examined_tiles == 9
+    assert tiled.active_cells == {(5, 5), (6, 5), (5, 6), (6, 6), (100, 100), (101, 100), (102, 100)}
+    tiled.active_cells = {(5, 5)}
+    tiled.step(200, 200)
+    assert tiled._tiles == {}
+
+
+def test_parallelgameoflifeengine_matches_set_engine():
+    np.random.seed(11)
+    cells = set(zip(np.random.randint(-2, 70, 1500).tolist(), np.random.randint(-2, 50, 1500).tolist()))
+    gol = GameOfLifeEngine()
+    gol.active_cells = set(cells)
+    parallel = ParallelGameOfLifeEngine(workers=3, parallel_threshold=0)
+    parallel.active_cells = set(cells)
+    try:
+        for i in range(30):
+            x_max, y_max = (67, 47) if i < 15 else (60, 30)
+            assert parallel.step(x_max, y_max) == gol.step(x_max, y_max)
+        # Below the threshold, the board is stepped on the calling thread
+        parallel.parallel_threshold = 10**6
+        assert parallel.step(60, 30) == gol.step(60, 30)
+    finally:
+        parallel.close()
+
+
+def test_engines_with_other_rules():
+    np.random.seed(13)
+    cells = set(zip(np.random.randint(-2, 70, 1000).tolist(), np.random.randint(-2, 40, 1000).tolist()))
+    for rule in ["B36/S23", "B2/S", "B3678/S34678"]:
+        gol = GameOfLifeEngine()
+        gol.set_rule(rule)
+        gol.active_cells = set(cells)
+        others = [DenseGameOfLifeEngine(), BitboardGameOfLifeEngine(), IncrementalGameOfLifeEngine(),
+                  TiledGameOfLifeEngine(tile_size=16), ParallelGameOfLifeEngine(workers=2, parallel_threshold=0)]
+        for other in others:
+            other.set_rule(rule)
+            other.active_cells = set(cells)
+        for i in range(10):
+            expected = gol.step(67, 37)
+            for other in others:
+                assert other.step(67, 37) == expected, (rule, type(other).__name__)
+        others[-1].close()
+
+    # Hashlife is unbounded, so compare against a large board
+    gol = GameOfLifeEngine()
+    gol.set_rule("B36/S23")
+    gol.active_cells = translate(cells, 500, 500)
+    hashlife = HashlifeGameOfLifeEngine()
+    hashlife.set_rule("B36/S23")
+    hashlife.active_cells = cells
+    hashlife.advance(12)
+    for _ in range(12):
+        gol.step(1000, 1000)
+    assert hashlife.active_cells == translate(gol.active_cells, -500, -500)
+
+
+def test_parse_rule():
+    assert parse_rule("B3/S23") == ({3}, {2, 3})
+    assert parse_rule("b36/s23") == ({3, 6}, {2, 3})
+    assert parse_rule("B2/S") == ({2}, set())
+    assert parse_rule("23/3") == ({3}, {2, 3})
+    assert parse_rule("S23/B36") == ({3, 6}, {2, 3})
+    with pytest.raises(RuntimeError):
+        parse_rule("B0/S8")
+    with pytest.raises(RuntimeError):
+        parse_rule("Conway")
+
+
+def test_compile_rule():
+    table = compile_rule("B3/S23")
+    assert len(table) == 512
+    assert table[0b000000111] == 1  # dead cell, 3 neighbors
+    assert table[0b000010011] == 1  # live cell, 2 neighbors
+    assert table[0b000010001] == 0  # live cell, 1 neighbor
+    assert table[0b000000011] == 0  # dead cell, 2 neighbors
+    assert compile_rule("B36/S23")[0b111000111] == 1
+
+
+def test_rle_rule():
+    assert rle_rule("x = 3, y = 3, rule = B36/S23\nbo$2bo$3o!") == "B36/S23"
+    assert rle_rule("#C comment\nx = 3, y = 3\nbo$2bo$3o!") == "B3/S23"
+    assert rle_decode("#C a comment\nx = 3, y = 3, rule = B36/S23\nbob$2bo$3o!") == rle_decode("bob$2bo$3o!")
+
+
 def test_translate():
     assert translate({(2,2), (3, 3), (4, 4)}, 1, 2) == {(3, 4), (4, 5), (5, 6)}
 